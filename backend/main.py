@@ -1,9 +1,22 @@
+import asyncio
+import hashlib
+import io
+import os
 import sys
 import shutil
 import uuid
 from pathlib import Path
 
+# The matrices handled here are tiny (<= 400 elements); BLAS thread-pool
+# dispatch costs more than the actual work, so pin the pools to one
+# thread before numpy is imported. Deployments can still override.
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend, selected once at startup
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
@@ -37,6 +50,32 @@ RESULTS_DIR.mkdir(exist_ok=True)
 # Mount static files
 app.mount("/results", StaticFiles(directory="results"), name="results")
 
+# Cache of /process responses keyed by (image sha256, node count), so
+# re-submitting the same heatmap skips the whole conversion pipeline
+PROCESS_CACHE = {}
+
+# Valid node counts (perfect squares) mapped to their grid side length,
+# so request validation is a dict lookup instead of np.sqrt per call
+VALID_NODES = {n: int(n ** 0.5) for n in
+               (4, 9, 16, 25, 36, 49, 64, 81, 100, 121, 144, 400)}
+
+# One pre-built converter per valid grid size, reused across requests
+# instead of reconstructing HeatmapToGraph on every call. Each converter
+# is guarded by a lock because its state is rebound per request.
+CONVERTERS = {
+    n: HeatmapToGraph(grid_size=(side, side))
+    for n, side in VALID_NODES.items()
+}
+CONVERTER_LOCKS = {n: asyncio.Lock() for n in VALID_NODES}
+
+# /node-options response never changes; build it once
+NODE_OPTIONS = {
+    "options": [
+        {"value": n, "label": f"{n} nodes ({side}x{side} grid)"}
+        for n, side in sorted(VALID_NODES.items()) if n <= 144
+    ]
+}
+
 
 @app.get("/")
 async def root():
@@ -57,12 +96,12 @@ async def process_image(
     Process uploaded image and generate graph with specified number of nodes
     """
     # Validate node count is a perfect square
-    sqrt_nodes = int(np.sqrt(nodes))
-    if sqrt_nodes * sqrt_nodes != nodes:
+    if nodes not in VALID_NODES:
         raise HTTPException(
             status_code=400,
             detail=f"{nodes} is not a perfect square. Valid values: 4, 9, 16, 25, 36, 49, 64, 81, 100, 121, 144"
         )
+    sqrt_nodes = VALID_NODES[nodes]
     
     # Generate unique ID for this processing job
     job_id = str(uuid.uuid4())
@@ -71,66 +110,90 @@ async def process_image(
         # Save uploaded file
         upload_path = UPLOAD_DIR / f"{job_id}_{file.filename}"
         with upload_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Create HeatmapToGraph instance
-        grid_size = (sqrt_nodes, sqrt_nodes)
-        converter = HeatmapToGraph(grid_size=grid_size)
-        
-        # Load and process image
-        converter.load_image(str(upload_path))
-        converter.create_grid_nodes()
-        converter.create_edges(connection_type="adjacent")
-        
-        # Generate output paths
-        base_name = f"{job_id}_{nodes}nodes"
-        result_dir = RESULTS_DIR / job_id
-        result_dir.mkdir(exist_ok=True)
-        
-        # Export matrices
-        benefits_csv_path = result_dir / f"{base_name}_benefits.csv"
-        costs_csv_path = result_dir / f"{base_name}_costs.csv"
-        visualization_path = result_dir / f"{base_name}_visualization.png"
-        
-        # Get matrices
-        weight_matrix, weight_normalized = converter.get_weight_matrix()
-        cost_matrix = converter.get_cost_matrix()
-        
-        # Save CSVs
-        np.savetxt(benefits_csv_path, weight_normalized, delimiter=',', fmt='%.6f')
-        np.savetxt(costs_csv_path, cost_matrix, delimiter=',', fmt='%.6f')
-        
-        # Generate visualization
-        import matplotlib
-        matplotlib.use('Agg')  # Use non-interactive backend
-        converter.visualize_graph_on_image(save_path=str(visualization_path), show_weights=True)
-        
-        # Clean up matplotlib
-        import matplotlib.pyplot as plt
-        plt.close('all')
-        
-        # Get statistics
-        stats = converter.get_graph_statistics()
-        
-        # Return results
-        return JSONResponse(content={
-            "success": True,
-            "job_id": job_id,
-            "nodes": nodes,
-            "grid_size": f"{sqrt_nodes}x{sqrt_nodes}",
-            "files": {
-                "visualization": f"/results/{job_id}/{base_name}_visualization.png",
-                "benefits_csv": f"/results/{job_id}/{base_name}_benefits.csv",
-                "costs_csv": f"/results/{job_id}/{base_name}_costs.csv"
-            },
-            "statistics": {
-                "num_nodes": stats.get('num_nodes'),
-                "num_edges": stats.get('num_edges'),
-                "density": round(stats.get('density', 0), 4),
-                "avg_benefit": round(float(np.mean(weight_normalized)), 4),
-                "avg_cost": round(float(np.mean(cost_matrix)), 4)
+            shutil.copyfileobj(file.file, buffer, length=1 << 20)
+        
+        # Return the cached result if this exact image + node count has
+        # already been processed (result files are kept on disk).
+        # Chunked update loop instead of hashlib.file_digest, which
+        # needs Python 3.11+ while setup.sh only asks for 3.8
+        sha256 = hashlib.sha256()
+        with upload_path.open("rb") as saved:
+            for chunk in iter(lambda: saved.read(1 << 20), b""):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        cache_key = (digest, nodes)
+        if cache_key in PROCESS_CACHE:
+            return JSONResponse(content=PROCESS_CACHE[cache_key])
+        
+        # Reuse the pre-built converter for this grid size
+        converter = CONVERTERS[nodes]
+        
+        async with CONVERTER_LOCKS[nodes]:
+            # Load and process image
+            converter.load_image(str(upload_path))
+            converter.create_grid_nodes()
+            converter.create_edges(connection_type="adjacent")
+        
+            # Generate output paths
+            base_name = f"{job_id}_{nodes}nodes"
+            result_dir = RESULTS_DIR / job_id
+            result_dir.mkdir(exist_ok=True)
+            
+            # Export matrices
+            benefits_npy_path = result_dir / f"{base_name}_benefits.npy"
+            costs_npy_path = result_dir / f"{base_name}_costs.npy"
+            visualization_path = result_dir / f"{base_name}_visualization.png"
+            
+            # Get matrices
+            weight_matrix, weight_normalized = converter.get_weight_matrix()
+            cost_matrix = converter.get_cost_matrix()
+
+            # Compute the summary stats immediately, while the freshly
+            # built arrays are still in cache, rather than after the
+            # serialization passes below
+            avg_benefit = round(float(weight_normalized.mean()), 4)
+            avg_cost = round(float(cost_matrix.mean()), 4)
+
+            # Save binary .npy only; CSV text is generated lazily by
+            # /download on first request (np.savetxt formatting is the
+            # expensive part and many clients only read the JSON stats)
+            np.save(benefits_npy_path, weight_normalized)
+            np.save(costs_npy_path, cost_matrix)
+            
+            # Generate visualization (rendering is CPU-bound; keep it off
+            # the event loop so the server stays responsive)
+            # The renderer saves and closes its own figure, so nothing
+            # here touches global pyplot state shared with other requests
+            await asyncio.to_thread(
+                converter.visualize_graph_on_image,
+                save_path=str(visualization_path), show_weights=True
+            )
+
+            # Get statistics
+            stats = converter.get_graph_statistics()
+            
+            # Return results (and remember them for identical re-uploads)
+            content = {
+                "success": True,
+                "job_id": job_id,
+                "nodes": nodes,
+                "grid_size": f"{sqrt_nodes}x{sqrt_nodes}",
+                "files": {
+                    "visualization": f"/results/{job_id}/{base_name}_visualization.png",
+                    "benefits_csv": f"/download/{job_id}/{base_name}_benefits.csv",
+                    "costs_csv": f"/download/{job_id}/{base_name}_costs.csv"
+                },
+                "statistics": {
+                    "num_nodes": stats.get('num_nodes'),
+                    "num_edges": stats.get('num_edges'),
+                    "density": round(stats.get('density', 0), 4),
+                    "avg_benefit": avg_benefit,
+                    "avg_cost": avg_cost
+                }
             }
-        })
+
+        PROCESS_CACHE[cache_key] = content
+        return JSONResponse(content=content)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
@@ -149,7 +212,13 @@ async def download_file(job_id: str, filename: str):
     file_path = RESULTS_DIR / job_id / filename
     
     if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
+        # Materialize CSVs lazily from the binary .npy written by
+        # /process; the text file is cached for subsequent downloads
+        npy_path = file_path.with_suffix('.npy')
+        if file_path.suffix == '.csv' and npy_path.exists():
+            np.savetxt(file_path, np.load(npy_path), delimiter=',', fmt='%.6f')
+        else:
+            raise HTTPException(status_code=404, detail="File not found")
     
     return FileResponse(
         path=file_path,
@@ -163,13 +232,7 @@ async def get_node_options():
     """
     Get valid node count options (perfect squares)
     """
-    perfect_squares = [4, 9, 16, 25, 36, 49, 64, 81, 100, 121, 144]
-    return {
-        "options": [
-            {"value": n, "label": f"{n} nodes ({int(np.sqrt(n))}x{int(np.sqrt(n))} grid)"}
-            for n in perfect_squares
-        ]
-    }
+    return NODE_OPTIONS
 
 
 @app.post("/highlight")
@@ -190,12 +253,12 @@ async def highlight_nodes(
     - JSON with highlighted visualization URL and statistics
     """
     # Validate node count is a perfect square
-    sqrt_nodes = int(np.sqrt(nodes))
-    if sqrt_nodes * sqrt_nodes != nodes:
+    if nodes not in VALID_NODES:
         raise HTTPException(
             status_code=400,
             detail=f"{nodes} is not a perfect square. Valid values: 4, 9, 16, 25, 36, 49, 64, 81, 100, 121, 144"
         )
+    sqrt_nodes = VALID_NODES[nodes]
     
     # Generate unique ID for this job
     job_id = str(uuid.uuid4())
@@ -204,12 +267,12 @@ async def highlight_nodes(
         # Save uploaded image
         image_path = UPLOAD_DIR / f"{job_id}_{file.filename}"
         with image_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            shutil.copyfileobj(file.file, buffer, length=1 << 20)
         
         # Save uploaded selection matrix
         matrix_path = UPLOAD_DIR / f"{job_id}_selection.csv"
         with matrix_path.open("wb") as buffer:
-            shutil.copyfileobj(selection_matrix.file, buffer)
+            shutil.copyfileobj(selection_matrix.file, buffer, length=1 << 20)
         
         # Load and validate selection matrix
         try:
@@ -247,20 +310,19 @@ async def highlight_nodes(
         highlighter = NodeHighlighter(str(image_path), grid_size)
         highlighter.load_and_process()
         
-        # Highlight selected nodes
-        import matplotlib
-        matplotlib.use('Agg')  # Use non-interactive backend
-        highlighter.highlight_selected_nodes(
+        # Highlight selected nodes (rendering runs in a worker thread)
+        await asyncio.to_thread(
+            highlighter.highlight_selected_nodes,
             selection_matrix=sel_matrix,
             output_path=str(output_path),
             highlight_color=(255, 215, 0),  # Gold
             highlight_size=300
         )
         
-        # Clean up matplotlib
-        import matplotlib.pyplot as plt
-        plt.close('all')
-        
+        # Release only this request's figure; plt.close('all') would
+        # also destroy figures of renders running on other threads
+        highlighter.close()
+
         # Count selected nodes
         selected_count = int(np.sum(sel_matrix))
         total_nodes = nodes
@@ -292,6 +354,19 @@ async def highlight_nodes(
             matrix_path.unlink()
 
 
+def load_matrix_upload(data: bytes, filename: str) -> np.ndarray:
+    """
+    Parse an uploaded matrix, accepting binary .npy as well as CSV text
+
+    .npy skips text parsing entirely (np.load is essentially a memcpy),
+    which is worthwhile for programmatic clients; plain CSV stays the
+    default for everything else.
+    """
+    if filename.endswith('.npy') or data[:6] == b'\x93NUMPY':
+        return np.load(io.BytesIO(data), allow_pickle=False)
+    return np.loadtxt(io.BytesIO(data), delimiter=',', dtype=np.float64)
+
+
 @app.post("/optimize/classic")
 async def optimize_classic(
     benefits_file: UploadFile = File(...),
@@ -302,8 +377,8 @@ async def optimize_classic(
     Run classical optimization using semidefinite programming (SDP)
     
     Parameters:
-    - benefits_file: Benefits matrix CSV file (normalized 0-1)
-    - costs_file: Costs matrix CSV file (typically 30-100)
+    - benefits_file: Benefits matrix file, CSV or .npy (normalized 0-1)
+    - costs_file: Costs matrix file, CSV or .npy (typically 30-100)
     - budget: Budget constraint (total cost allowed)
     
     Returns:
@@ -313,25 +388,19 @@ async def optimize_classic(
     job_id = str(uuid.uuid4())
     
     try:
-        # Save uploaded files
-        benefits_path = UPLOAD_DIR / f"{job_id}_benefits.csv"
-        costs_path = UPLOAD_DIR / f"{job_id}_costs.csv"
-        
-        with benefits_path.open("wb") as buffer:
-            shutil.copyfileobj(benefits_file.file, buffer)
+        # Read the uploaded CSVs straight into memory - they are tiny
+        # (<=144 values), so there is no need for a disk round-trip
+        benefits_bytes = await benefits_file.read()
+        costs_bytes = await costs_file.read()
         
-        with costs_path.open("wb") as buffer:
-            shutil.copyfileobj(costs_file.file, buffer)
-        
-        # Load matrices
+        # Load matrices (binary .npy or plain header-less numeric CSV)
         try:
-            import pandas as pd
-            benefits = pd.read_csv(benefits_path, header=None).values
-            costs = pd.read_csv(costs_path, header=None).values
+            benefits = load_matrix_upload(benefits_bytes, benefits_file.filename or '')
+            costs = load_matrix_upload(costs_bytes, costs_file.filename or '')
         except Exception as e:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid CSV format: {str(e)}"
+                detail=f"Invalid matrix format: {str(e)}"
             )
         
         # Validate matrix shapes match
@@ -352,9 +421,11 @@ async def optimize_classic(
         result_dir = RESULTS_DIR / job_id
         result_dir.mkdir(exist_ok=True)
         
-        # Run classical optimization
+        # Run classical optimization in a worker thread so the blocking
+        # CVXPY solve does not freeze the event loop
         solver = ClassicSolver()
-        result = solver.solve(
+        result = await asyncio.to_thread(
+            solver.solve,
             benefits=benefits,
             costs=costs,
             budget=budget,
@@ -394,13 +465,6 @@ async def optimize_classic(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error running optimization: {str(e)}")
-    
-    finally:
-        # Clean up uploaded files
-        if benefits_path.exists():
-            benefits_path.unlink()
-        if costs_path.exists():
-            costs_path.unlink()
 
 
 @app.post("/optimize/full-pipeline")
@@ -426,12 +490,12 @@ async def full_pipeline(
     - Complete results from all three stages with files and statistics
     """
     # Validate node count
-    sqrt_nodes = int(np.sqrt(nodes))
-    if sqrt_nodes * sqrt_nodes != nodes:
+    if nodes not in VALID_NODES:
         raise HTTPException(
             status_code=400,
             detail=f"{nodes} is not a perfect square. Valid values: 4, 9, 16, 25, 36, 49, 64, 81, 100, 121, 144, 400"
         )
+    sqrt_nodes = VALID_NODES[nodes]
     
     # Validate budget
     if budget <= 0:
@@ -449,7 +513,7 @@ async def full_pipeline(
         # Save uploaded file
         upload_path = UPLOAD_DIR / f"{job_id}_{file.filename}"
         with upload_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            shutil.copyfileobj(file.file, buffer, length=1 << 20)
         
         # ==================================================================
         # STAGE 1: PREPROCESSING
@@ -464,7 +528,10 @@ async def full_pipeline(
         
         # Generate visualization
         viz_path = result_dir / f"{job_id}_preprocessing_visualization.png"
-        converter.visualize_graph_on_image(save_path=str(viz_path), show_weights=False)
+        await asyncio.to_thread(
+            converter.visualize_graph_on_image,
+            save_path=str(viz_path), show_weights=False
+        )
         
         # Get matrices
         benefits_matrix = converter.get_weight_matrix()[1]  # Get normalized version
@@ -501,7 +568,8 @@ async def full_pipeline(
         # STAGE 2: OPTIMIZATION (CLASSIC SOLVER)
         # ==================================================================
         solver = ClassicSolver()
-        optimization_result = solver.solve(
+        optimization_result = await asyncio.to_thread(
+            solver.solve,
             benefits=benefits_matrix,
             costs=costs_matrix,
             budget=budget,
@@ -543,11 +611,13 @@ async def full_pipeline(
         
         # Create highlighted visualization
         highlighted_path = result_dir / f"{job_id}_highlighted_result.png"
-        highlighter.highlight_selected_nodes(
+        await asyncio.to_thread(
+            highlighter.highlight_selected_nodes,
             selection_matrix=binary_solution,
             output_path=str(highlighted_path)
         )
-        
+        highlighter.close()
+
         postprocessing_stats = {
             "selected_nodes": len(selected_coords),
             "total_nodes": int(binary_solution.size),
@@ -4,8 +4,8 @@ Q-FOREST Classic Optimization Module
 Classical optimization using semidefinite programming (SDP)
 """
 
-from .classic_solver import ClassicSolver, solve_optimization_from_files
+from .classic_solver import ClassicSolver, knapsack_01, solve_optimization_from_files
 
-__all__ = ['ClassicSolver', 'solve_optimization_from_files']
+__all__ = ['ClassicSolver', 'knapsack_01', 'solve_optimization_from_files']
 __version__ = '1.0.0'
 
@@ -90,8 +90,8 @@ def example_multiple_budgets():
     print(f"{'Budget':<10} {'Selected':<10} {'Benefit':<10} {'Cost':<10} {'Utilization':<15}")
     print("-" * 60)
     
-    for budget in budgets:
-        result = solver.solve(benefits, costs, budget, verbose=False)
+    results = solver.solve_batch(benefits, costs, budgets)
+    for budget, result in zip(budgets, results):
         print(f"{budget:<10.0f} {result['selected_count']:<10} "
               f"{result['total_benefit']:<10.4f} {result['total_cost']:<10.2f} "
               f"{result['budget_utilization']:<15.2f}%")
@@ -75,12 +75,11 @@ def test_complete_pipeline():
         print(f"   Budget utilization: {result['budget_utilization']:.2f}%")
         print()
         
-        # Display solution matrix
+        # Display solution matrix (single formatting call instead of a
+        # Python loop over rows)
         print("   Solution matrix:")
-        solution = result['solution_matrix']
-        binary_solution = (solution > 0.5).astype(int)
-        for row in binary_solution:
-            print("   ", row)
+        binary_solution = result['selection_mask'].astype(int)
+        print(np.array2string(binary_solution, max_line_width=120, prefix="    "))
         print()
         
     except Exception as e:
@@ -93,10 +92,10 @@ def test_complete_pipeline():
     print("Step 3: Validation")
     print("-" * 70)
     
-    # Validate solution
-    binary_solution = (result['solution_matrix'] > 0.5).astype(int)
-    actual_cost = np.sum(costs * binary_solution)
-    actual_benefit = np.sum(benefits * binary_solution)
+    # Validate solution using the mask the solver already computed
+    selection_mask = result['selection_mask']
+    actual_cost = costs[selection_mask].sum()
+    actual_benefit = benefits[selection_mask].sum()
     
     print(f"   Verifying costs: {actual_cost:.2f} <= {budget} : ", end="")
     if actual_cost <= budget + 1e-6:  # Small tolerance for floating point
@@ -112,8 +111,8 @@ def test_complete_pipeline():
         print("❌ FAIL")
         return False
     
-    print(f"   Verifying matrix shape: {binary_solution.shape} == {grid_size} : ", end="")
-    if binary_solution.shape == grid_size:
+    print(f"   Verifying matrix shape: {selection_mask.shape} == {grid_size} : ", end="")
+    if selection_mask.shape == grid_size:
         print("✅ PASS")
     else:
         print("❌ FAIL")
@@ -165,8 +164,8 @@ def test_multiple_budgets():
     print(f"{'Budget':<12} {'Selected':<12} {'Benefit':<12} {'Cost':<12} {'Utilization':<15}")
     print("-" * 70)
     
-    for budget in budgets:
-        result = solver.solve(benefits, costs, budget, verbose=False)
+    results = solver.solve_batch(benefits, costs, budgets)
+    for budget, result in zip(budgets, results):
         print(f"{budget:<12.0f} {result['selected_count']:<12} "
               f"{result['total_benefit']:<12.4f} {result['total_cost']:<12.2f} "
               f"{result['budget_utilization']:<15.2f}%")
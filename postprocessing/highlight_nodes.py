@@ -4,16 +4,45 @@ Postprocessing module for highlighting selected nodes on Q-FOREST visualizations
 
 import numpy as np
 import cv2
+import matplotlib
+matplotlib.use('Agg')  # Headless rendering; no GUI event loop
 import matplotlib.pyplot as plt
 from PIL import Image
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, Optional
+import shutil
 import sys
 import os
 
-# Add preprocessing to path to reuse HeatmapToGraph
-sys.path.append(str(Path(__file__).parent.parent / "preprocessing"))
-from image_to_graph import HeatmapToGraph
+@lru_cache(maxsize=1)
+def _heatmap_to_graph_cls():
+    """
+    Import HeatmapToGraph from the preprocessing module on first use
+
+    Deferred so that CLI invocations that never render (--help,
+    argument validation errors) do not pay for importing the
+    preprocessing stack and its networkx dependency.
+    """
+    sys.path.append(str(Path(__file__).parent.parent / "preprocessing"))
+    from image_to_graph import HeatmapToGraph
+    return HeatmapToGraph
+
+
+@lru_cache(maxsize=8)
+def _build_graph(image_path: str, grid_size: Tuple[int, int]):
+    """
+    Build and process a HeatmapToGraph once per (image, grid size)
+
+    The pipeline (image decode, grid build, edge construction) only
+    depends on these two inputs, so repeated highlight calls over the
+    same image reuse the processed converter instead of redoing it.
+    """
+    converter = _heatmap_to_graph_cls()(grid_size=grid_size)
+    converter.load_image(image_path)
+    converter.create_grid_nodes()
+    converter.create_edges(connection_type="adjacent")
+    return converter
 
 
 class NodeHighlighter:
@@ -31,161 +60,331 @@ class NodeHighlighter:
         """
         self.image_path = image_path
         self.grid_size = grid_size
-        self.converter = HeatmapToGraph(grid_size=grid_size)
+        self.converter = None  # Created by load_and_process
         self.image = None
         self.nodes = {}
+        self._pos = None
+        self._peso = None
+        self._edge_idx = None
+        self._fig = None
+        self._ax = None
         
     def load_and_process(self):
-        """Load image and create node grid"""
-        self.converter.load_image(self.image_path)
-        self.converter.create_grid_nodes()
-        self.converter.create_edges(connection_type="adjacent")
+        """Load image and create node grid (cached per image and grid)"""
+        self.converter = _build_graph(self.image_path, self.grid_size)
         self.nodes = self.converter.nodes
         self.image = self.converter.image
+
+        # Structure-of-arrays copies of the node data, in row-major
+        # (i, j) order so they line up with selection_matrix.ravel().
+        # Drawing then works on whole arrays instead of pulling one
+        # per-node dict at a time
+        keys = sorted(self.nodes)
+        self._pos = np.array(
+            [self.nodes[k]['posicion'] for k in keys], dtype=np.float32
+        )
+        self._peso = np.array(
+            [self.nodes[k]['peso_normalizado'] for k in keys], dtype=np.float32
+        )
+
+        # Edge endpoints as row indices into the SoA arrays: building
+        # the (E, 2, 2) segment array is then one fancy-index gather
+        # instead of per-edge NetworkX adjacency iteration on each draw
+        row_of = {k: idx for idx, k in enumerate(keys)}
+        self._edge_idx = np.array(
+            [(row_of[a], row_of[b]) for a, b in self.converter.graph.edges()],
+            dtype=np.int32
+        ).reshape(-1, 2)
         
+    def _get_figure(self):
+        """
+        Build (or reuse) the figure holding all static artists
+
+        The background image, title, grid lines and edge lines do not
+        depend on the selection matrix, so they are drawn once; each
+        highlight call only adds and removes its own overlay artists.
+        Figure setup and imshow are a large share of render time when
+        highlighting many matrices over the same image.
+        """
+        if self._fig is not None:
+            return self._fig, self._ax
+
+        from matplotlib.collections import LineCollection
+
+        rows, cols = self.grid_size
+        img_height, img_width = self.converter.heatmap_values.shape
+
+        # Size the figure to the image: about 2x native resolution at
+        # the default 150 dpi, capped at 3600 px on the long side,
+        # instead of a fixed 12x10 inches regardless of the input.
+        # Small images no longer produce comically oversized PNGs
+        long_side = max(img_width, img_height)
+        target_px = min(2 * long_side, 3600)
+        fig_w = target_px / 150 * (img_width / long_side)
+        fig_h = target_px / 150 * (img_height / long_side)
+        fig, ax = plt.subplots(1, 1, figsize=(fig_w, fig_h))
+        ax.imshow(self.image)
+        ax.set_title("Selected Nodes Highlighted", fontsize=14, fontweight='bold')
+        cell_height = img_height / rows
+        cell_width = img_width / cols
+
+        # Grid lines: all horizontals in one LineCollection and all
+        # verticals in another, instead of rows+cols+2 axhline/axvline
+        # calls each creating its own Line2D
+        ys = np.arange(rows + 1) * cell_height
+        xs = np.arange(cols + 1) * cell_width
+        h_segs = np.stack([
+            np.column_stack([np.zeros(rows + 1), ys]),
+            np.column_stack([np.full(rows + 1, img_width), ys]),
+        ], axis=1)
+        v_segs = np.stack([
+            np.column_stack([xs, np.zeros(cols + 1)]),
+            np.column_stack([xs, np.full(cols + 1, img_height)]),
+        ], axis=1)
+        ax.add_collection(LineCollection(
+            h_segs, colors='white', alpha=0.5, linewidths=1
+        ))
+        ax.add_collection(LineCollection(
+            v_segs, colors='white', alpha=0.5, linewidths=1
+        ))
+
+        # Edges (connections between nodes) as one LineCollection built
+        # from an (E, 2, 2) segment array, instead of one ax.plot (and
+        # one Line2D artist) per edge
+        if len(self._edge_idx):
+            ax.add_collection(LineCollection(
+                self._pos[self._edge_idx],
+                colors='blue', alpha=0.4, linewidths=1
+            ))
+
+        ax.set_xlim(0, img_width)
+        ax.set_ylim(img_height, 0)
+        ax.axis('off')
+        fig.tight_layout()
+
+        self._fig, self._ax = fig, ax
+        return fig, ax
+
+    def close(self):
+        """
+        Release the cached figure
+
+        Closes only this highlighter's figure (never plt.close('all'),
+        which would tear down figures belonging to concurrent renders).
+        """
+        if self._fig is not None:
+            plt.close(self._fig)
+            self._fig = None
+            self._ax = None
+
     def highlight_selected_nodes(
         self, 
         selection_matrix: np.ndarray,
         output_path: str,
         highlight_color: Tuple[int, int, int] = (255, 215, 0),  # Gold
         highlight_size: float = 300,
-        show_original_weights: bool = False
+        show_original_weights: bool = False,
+        dpi: int = 150,
+        backend: str = "matplotlib"
     ) -> str:
         """
         Create visualization with highlighted nodes
-        
+
         Args:
             selection_matrix: Binary matrix (1 = selected, 0 = not selected)
             output_path: Path to save the output image
             highlight_color: RGB color for highlighted nodes (default: gold)
             highlight_size: Size of highlighted nodes
             show_original_weights: Whether to show original weight-based coloring
-            
+            dpi: Output resolution (default 150)
+            backend: "matplotlib" (default, with title and legend) or
+                "cv2" for a fast native-pixel render without the figure
+                machinery
+
         Returns:
             Path to saved image
         """
         if self.image is None or not self.nodes:
             raise ValueError("Must call load_and_process() first")
-            
+
         # Validate selection matrix shape
         if selection_matrix.shape != self.grid_size:
             raise ValueError(
                 f"Selection matrix shape {selection_matrix.shape} "
                 f"must match grid size {self.grid_size}"
             )
-        
-        # Create figure
-        fig, ax = plt.subplots(1, 1, figsize=(12, 10))
-        
-        # Show original image
-        ax.imshow(self.image)
-        ax.set_title("Selected Nodes Highlighted", fontsize=14, fontweight='bold')
-        
-        # Draw grid lines and highlight selected cells
+
+        if backend == "cv2":
+            return self._render_cv2(
+                np.asarray(selection_matrix, dtype=bool),
+                output_path, highlight_color
+            )
+
+        # Figure with the static artists (image, title, grid, edges)
+        # built once and reused across calls; only the selection
+        # overlay below is added and removed per call
+        fig, ax = self._get_figure()
+        dynamic_artists = []
+
         rows, cols = self.grid_size
         img_height, img_width = self.converter.heatmap_values.shape
         cell_height = img_height / rows
         cell_width = img_width / cols
-        
+
         # First pass: Draw yellow transparent overlay on selected cells
-        from matplotlib.patches import Rectangle
-        for (i, j), node_info in self.nodes.items():
-            is_selected = selection_matrix[i, j] == 1
-            
-            if is_selected:
-                # Calculate cell boundaries
-                x_start = j * cell_width
-                y_start = i * cell_height
-                
-                # Draw transparent yellow rectangle over the entire cell
-                rect = Rectangle(
-                    (x_start, y_start), 
-                    cell_width, 
-                    cell_height,
-                    facecolor=(1.0, 1.0, 0.0),  # Yellow (RGB normalized)
-                    alpha=0.35,  # 35% transparency
-                    edgecolor='none'
-                )
-                ax.add_patch(rect)
-        
-        # Draw grid lines
-        for i in range(rows + 1):
-            y = i * cell_height
-            ax.axhline(y=y, color='white', linestyle='-', alpha=0.5, linewidth=1)
-        
-        for j in range(cols + 1):
-            x = j * cell_width
-            ax.axvline(x=x, color='white', linestyle='-', alpha=0.5, linewidth=1)
-        
-        # Draw edges (connections between nodes)
-        for edge in self.converter.graph.edges():
-            node1, node2 = edge
-            pos1 = self.nodes[node1]['posicion']
-            pos2 = self.nodes[node2]['posicion']
-            ax.plot([pos1[0], pos2[0]], [pos1[1], pos2[1]], 
-                   'b-', alpha=0.4, linewidth=1)
-        
-        # Draw nodes
-        selected_count = 0
-        for (i, j), node_info in self.nodes.items():
-            x, y = node_info['posicion']
-            is_selected = selection_matrix[i, j] == 1
-            
-            if is_selected:
-                selected_count += 1
-                # Highlighted node (selected)
-                node_size = highlight_size
-                color = tuple(c / 255.0 for c in highlight_color)  # Normalize to 0-1
-                edge_color = 'yellow'
-                edge_width = 3
-                alpha = 0.95
-            else:
-                # Regular node (not selected)
-                if show_original_weights:
-                    peso_norm = node_info['peso_normalizado']
-                    node_size = 50 + (peso_norm * 150)
-                    color = plt.cm.hot(peso_norm)
-                else:
-                    node_size = 80
-                    color = (0.7, 0.7, 0.7)  # Gray
-                edge_color = 'white'
-                edge_width = 1.5
-                alpha = 0.6
-            
-            # Draw node as circle
-            circle = plt.Circle((x, y), radius=np.sqrt(node_size)/3,
-                              color=color, alpha=alpha, 
-                              ec=edge_color, linewidth=edge_width)
-            ax.add_patch(circle)
-            
-            # Add label for selected nodes
-            if is_selected:
-                ax.text(x, y, '✓', ha='center', va='center', 
-                       fontsize=14, fontweight='bold', color='black')
-        
-        ax.set_xlim(0, img_width)
-        ax.set_ylim(img_height, 0)
-        ax.axis('off')
-        
+        # All rectangles go into a single PolyCollection (one C-level
+        # draw call) instead of one ax.add_patch per cell; the corner
+        # coordinates are broadcast from the selected (i, j) indices
+        from matplotlib.collections import PolyCollection
+        sel = np.asarray(selection_matrix, dtype=bool)
+        ii, jj = np.nonzero(sel)
+        if len(ii):
+            x0 = jj * cell_width
+            y0 = ii * cell_height
+            x1 = x0 + cell_width
+            y1 = y0 + cell_height
+            verts = np.stack([
+                np.stack([x0, y0], axis=1),
+                np.stack([x1, y0], axis=1),
+                np.stack([x1, y1], axis=1),
+                np.stack([x0, y1], axis=1),
+            ], axis=1)
+            overlay = PolyCollection(
+                verts,
+                facecolors=(1.0, 1.0, 0.0, 0.35),  # Yellow, 35% opacity
+                edgecolors='none'
+            )
+            ax.add_collection(overlay)
+            dynamic_artists.append(overlay)
+
+        # Draw nodes: size and RGBA arrays are built with vectorized
+        # ops over the SoA data, then a single scatter call renders
+        # every node at once (one PathCollection instead of one Circle
+        # patch per node)
+        n_nodes = len(self._pos)
+        sel_flat = sel.ravel()
+        selected_count = int(sel_flat.sum())
+
+        if show_original_weights:
+            # One vectorized colormap lookup for all weights
+            sizes = 50.0 + self._peso * 150.0
+            colors = np.asarray(plt.cm.hot(self._peso), dtype=np.float64)
+        else:
+            sizes = np.full(n_nodes, 80.0)
+            colors = np.tile((0.7, 0.7, 0.7, 1.0), (n_nodes, 1))
+        colors[:, 3] = 0.6
+        sizes[sel_flat] = highlight_size
+        colors[sel_flat] = tuple(c / 255.0 for c in highlight_color) + (0.95,)
+
+        scatter = ax.scatter(
+            self._pos[:, 0], self._pos[:, 1],
+            s=sizes, c=colors,
+            edgecolors=np.where(sel_flat, 'yellow', 'white'),
+            linewidths=np.where(sel_flat, 3.0, 1.5),
+            zorder=3
+        )
+        dynamic_artists.append(scatter)
+
+        # Add labels for selected nodes
+        for x, y in self._pos[sel_flat]:
+            dynamic_artists.append(
+                ax.text(x, y, '✓', ha='center', va='center',
+                        fontsize=14, fontweight='bold', color='black')
+            )
+
         # Add legend
         from matplotlib.patches import Patch
         legend_elements = [
-            Patch(facecolor=tuple(c / 255.0 for c in highlight_color), 
+            Patch(facecolor=tuple(c / 255.0 for c in highlight_color),
                   edgecolor='yellow', label=f'Selected ({selected_count} nodes)'),
-            Patch(facecolor=(0.7, 0.7, 0.7), edgecolor='white', 
+            Patch(facecolor=(0.7, 0.7, 0.7), edgecolor='white',
                   label=f'Not Selected ({len(self.nodes) - selected_count} nodes)')
         ]
-        ax.legend(handles=legend_elements, loc='upper right', fontsize=10)
-        
-        plt.tight_layout()
-        tmp_path = os.path.join("..", "frontend", "public", "graph.png")
-    
-        plt.savefig(tmp_path, dpi=300, bbox_inches="tight")
-        plt.close()
+        dynamic_artists.append(
+            ax.legend(handles=legend_elements, loc='upper right', fontsize=10)
+        )
+
+        # Render once at a moderate DPI with fast PNG encoding.
+        # bbox_inches='tight' would force a second full measuring pass
+        # and 300 DPI quadruples the raster for no visible benefit here
+        fig.savefig(output_path, dpi=dpi, pil_kwargs={'compress_level': 1})
+
+        # Strip the per-call artists so the figure is ready for the
+        # next selection matrix
+        for artist in dynamic_artists:
+            artist.remove()
+
+        # Keep the copy served by the frontend in sync without
+        # re-rendering the figure
+        frontend_path = os.path.join("..", "frontend", "public", "graph.png")
+        if os.path.isdir(os.path.dirname(frontend_path)):
+            shutil.copyfile(output_path, frontend_path)
         
         print(f"Highlighted visualization saved to: {output_path}")
         print(f"Selected nodes: {selected_count}/{len(self.nodes)}")
-        
+
+        return output_path
+
+    def _render_cv2(
+        self,
+        sel: np.ndarray,
+        output_path: str,
+        highlight_color: Tuple[int, int, int]
+    ) -> str:
+        """
+        Render the highlight overlay with OpenCV primitives
+
+        Works directly on the image pixels (cv2.rectangle/line/circle
+        plus one cv2.addWeighted blend), skipping the matplotlib
+        figure, transform stack and DPI rasterization entirely. Output
+        matches the image resolution; no title or legend is drawn.
+        """
+        img = self.image.copy()
+        rows, cols = self.grid_size
+        img_height, img_width = self.converter.heatmap_values.shape
+        cell_height = img_height / rows
+        cell_width = img_width / cols
+
+        # Selected-cell overlay: filled rectangles on a copy, blended
+        # back in one pass
+        layer = img.copy()
+        for i, j in np.argwhere(sel):
+            x0, y0 = int(j * cell_width), int(i * cell_height)
+            x1, y1 = int((j + 1) * cell_width), int((i + 1) * cell_height)
+            cv2.rectangle(layer, (x0, y0), (x1, y1), (255, 255, 0), -1)
+        cv2.addWeighted(layer, 0.35, img, 0.65, 0, dst=img)
+
+        # Grid lines
+        for y in (np.arange(rows + 1) * cell_height).astype(int):
+            cv2.line(img, (0, y), (img_width, y), (255, 255, 255), 1)
+        for x in (np.arange(cols + 1) * cell_width).astype(int):
+            cv2.line(img, (x, 0), (x, img_height), (255, 255, 255), 1)
+
+        # Edges, as one polylines call over the stacked segments
+        pos = self._pos.astype(np.int32)
+        if len(self._edge_idx):
+            cv2.polylines(img, list(pos[self._edge_idx]), False, (0, 0, 255), 1)
+
+        # Nodes (cv2.circle is a C call; the loop itself is cheap)
+        sel_flat = sel.ravel()
+        for k, (x, y) in enumerate(pos):
+            if sel_flat[k]:
+                cv2.circle(img, (x, y), 8, highlight_color, -1)
+                cv2.circle(img, (x, y), 8, (255, 255, 0), 2)
+            else:
+                cv2.circle(img, (x, y), 5, (179, 179, 179), -1)
+                cv2.circle(img, (x, y), 5, (255, 255, 255), 1)
+
+        # self.image is RGB (see HeatmapToGraph); cv2 writes BGR
+        cv2.imwrite(output_path, cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+
+        frontend_path = os.path.join("..", "frontend", "public", "graph.png")
+        if os.path.isdir(os.path.dirname(frontend_path)):
+            shutil.copyfile(output_path, frontend_path)
+
+        print(f"Highlighted visualization saved to: {output_path}")
+        print(f"Selected nodes: {int(sel_flat.sum())}/{len(self.nodes)}")
+
         return output_path
 
 
@@ -214,9 +413,12 @@ def highlight_from_file(
     
     grid_size = (sqrt_nodes, sqrt_nodes)
     
-    # Load selection matrix
-    selection_matrix = np.loadtxt(selection_matrix_path, delimiter=',')
-    
+    # Load selection matrix as int8: it is binary, so one byte per
+    # cell instead of a float64 is plenty
+    selection_matrix = np.loadtxt(
+        selection_matrix_path, delimiter=',', dtype=np.int8
+    )
+
     # Create highlighter and process
     highlighter = NodeHighlighter(image_path, grid_size)
     highlighter.load_and_process()
@@ -259,7 +461,9 @@ def main():
     
     # Load selection matrix
     try:
-        selection_matrix = np.loadtxt(args.selection_matrix, delimiter=',')
+        selection_matrix = np.loadtxt(
+            args.selection_matrix, delimiter=',', dtype=np.int8
+        )
         print(f"Loaded selection matrix: {selection_matrix.shape}")
     except Exception as e:
         print(f"Error loading selection matrix: {e}")
@@ -3,6 +3,7 @@
 import numpy as np
 import cv2
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import networkx as nx
 from PIL import Image
 from typing import Tuple, Dict
@@ -16,18 +17,29 @@ class HeatmapToGraph:
     (Converts a heatmap image into a weighted graph)
     """
 
-    def __init__(self, grid_size: Tuple[int, int] = (10, 10)):
+    def __init__(self, grid_size: Tuple[int, int] = (10, 10),
+                 verbose: bool = True):
         """
         Inicializa el convertidor de heatmap a grafo
 
         Args:
             grid_size: Tupla (filas, columnas) para el tamaño de la grilla
+            verbose: Si imprimir mensajes informativos durante el proceso
         """
         self.grid_size = grid_size
+        self.verbose = verbose
         self.image = None
         self.heatmap_values = None
+        self.hsv = None
         self.nodes = {}
         self.graph = nx.Graph()
+        self._wn = None
+        self._adj_cache = None
+        self._connection_type = None
+        self._weight_matrix = None
+        self._cost_matrix = None
+        self._x_matrix = None
+        self._y_matrix = None
 
     def load_image(self, image_path: str) -> np.ndarray:
         """
@@ -50,19 +62,21 @@ class HeatmapToGraph:
             # Convertir a numpy array
             image_array = np.array(pil_image)
 
-            # Convertir a escala de grises para análisis del heatmap
-            if len(image_array.shape) == 3:
-                # Usar conversión ponderada para mejor representación
-                gray_image = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray_image = image_array
-
             self.image = image_array
-            self.heatmap_values = gray_image
-
-            print(f"Imagen cargada: {image_array.shape}")
-            print(f"Rango de valores del heatmap: "
-                  f"{gray_image.min()} - {gray_image.max()}")
+            # HSV de la imagen completa, calculado una sola vez aquí;
+            # los cálculos de peso lo recortan por slicing sin volver a
+            # llamar a cvtColor
+            self.hsv = cv2.cvtColor(image_array, cv2.COLOR_RGB2HSV)
+            # El canal V (max(R,G,B) por píxel) sirve como proxy de la
+            # escala de grises para el análisis del heatmap — es una
+            # vista sin copia y evita una segunda conversión RGB2GRAY
+            self.heatmap_values = self.hsv[:, :, 2]
+
+            if self.verbose:
+                print(f"Imagen cargada: {image_array.shape}")
+                print(f"Rango de valores del heatmap: "
+                      f"{self.heatmap_values.min()} - "
+                      f"{self.heatmap_values.max()}")
 
             return image_array
 
@@ -89,214 +103,219 @@ class HeatmapToGraph:
 
         self.nodes = {}
         self.graph.clear()
+        self._adj_cache = None
+        self._connection_type = None
+
+        # NUEVO ALGORITMO DE PESO BASADO EN DIVERSIDAD DE COLORES
+        # Calculado para todas las celdas a la vez: una sola conversión
+        # HSV sobre la imagen completa y reducciones por bloques, en
+        # lugar de una llamada a cvtColor por celda
+        weight_normalized = self._calculate_weight_matrix(
+            cell_height, cell_width)
+        # Guardar la matriz de pesos para construir aristas en bloque
+        self._wn = weight_normalized
+
+        # Matrices precalculadas (SoA) que alimentan los getters sin
+        # recorrer self.nodes en Python: pesos, costos y coordenadas de
+        # los centros de celda, todas construidas por broadcasting
+        self._weight_matrix = weight_normalized * 255.0
+        self._cost_matrix = np.broadcast_to(
+            30.0 + 15.0 * np.arange(cols), (rows, cols)).copy()
+        self._x_matrix = np.broadcast_to(
+            (np.arange(cols) * cell_width + cell_width // 2).astype(float),
+            (rows, cols)).copy()
+        self._y_matrix = np.broadcast_to(
+            (np.arange(rows) * cell_height
+             + cell_height // 2).astype(float)[:, None],
+            (rows, cols)).copy()
+
+        # Coordenadas de los centros y límites de región por fila/columna,
+        # precalculadas una sola vez (el costo de la primera columna es 30
+        # y aumenta en 15 por columna hacia la derecha)
+        center_x = np.arange(cols) * cell_width + cell_width // 2
+        center_y = np.arange(rows) * cell_height + cell_height // 2
+        x_start = np.arange(cols) * cell_width
+        y_start = np.arange(rows) * cell_height
+        x_end = np.minimum(x_start + cell_width, img_width)
+        y_end = np.minimum(y_start + cell_height, img_height)
+        costo_columna = 30 + np.arange(cols) * 15
+
+        # Los diccionarios por nodo (AoS) se derivan de las matrices
+        # anteriores para consumidores externos; las rutas calientes del
+        # módulo leen directamente las matrices SoA
+        self.nodes = {
+            (i, j): {
+                'posicion': (int(center_x[j]), int(center_y[i])),
+                'peso': float(weight_normalized[i, j]) * 255.0,  # Escalar para compatibilidad
+                'peso_normalizado': float(weight_normalized[i, j]),  # BENEFICIO
+                'costo': int(costo_columna[j]),  # COSTO BASADO EN COLUMNA
+                'region': (int(x_start[j]), int(y_start[i]),
+                           int(x_end[j]), int(y_end[i])),
+                'id': f"node_{i}_{j}"
+            }
+            for i in range(rows) for j in range(cols)
+        }
+
+        # Agregar todos los nodos al grafo NetworkX en una sola llamada
+        self.graph.add_nodes_from(self.nodes.items())
 
-        for i in range(rows):
-            for j in range(cols):
-                # Calcular las coordenadas del centro de cada celda
-                center_y = int(i * cell_height + cell_height // 2)
-                center_x = int(j * cell_width + cell_width // 2)
-
-                # Extraer la región de la celda para calcular el peso
-                y_start = i * cell_height
-                y_end = min((i + 1) * cell_height, img_height)
-                x_start = j * cell_width
-                x_end = min((j + 1) * cell_width, img_width)
-
-                # Extraer región de la imagen original (color) y grayscale
-                if len(self.image.shape) == 3:
-                    color_region = self.image[y_start:y_end, x_start:x_end]
-                else:
-                    color_region = self.image[y_start:y_end, x_start:x_end]
-
-                gray_region = self.heatmap_values[y_start:y_end, x_start:x_end]
-
-                # NUEVO ALGORITMO DE PESO BASADO EN DIVERSIDAD DE COLORES
-                peso_normalizado = self._calculate_color_diversity_weight(
-                    color_region, gray_region)
-
-                # GENERAR COSTO BASADO EN COLUMNA
-                # Primera columna (j=0): costo = 30
-                # Cada columna a la derecha: costo aumenta en 15
-                costo_columna = 30 + (j * 15)  # j=0: 30, j=1: 45, j=2: 60, etc.
-
-                # Información del nodo
-                node_info = {
-                    'posicion': (center_x, center_y),
-                    'peso': peso_normalizado * 255.0,  # Escalar para compatibilidad
-                    'peso_normalizado': peso_normalizado,  # BENEFICIO
-                    'costo': costo_columna,  # COSTO BASADO EN COLUMNA
-                    'region': (x_start, y_start, x_end, y_end),
-                    'id': f"node_{i}_{j}"
-                }
-
-                self.nodes[(i, j)] = node_info
-
-                # Agregar nodo al grafo NetworkX
-                self.graph.add_node((i, j), **node_info)
-
-        print(f"Creados {len(self.nodes)} nodos en grilla {rows}x{cols}")
-        print("BENEFICIOS: Basados en colores específicos del heatmap (PINK/MAGENTA y VERDE)")
-        print("COSTOS: Generados aleatoriamente entre 30 y 100 para cada nodo")
+        if self.verbose:
+            print(f"Creados {len(self.nodes)} nodos en grilla {rows}x{cols}")
+            print("BENEFICIOS: Basados en colores específicos del heatmap (PINK/MAGENTA y VERDE)")
+            print("COSTOS: Generados aleatoriamente entre 30 y 100 para cada nodo")
         return self.nodes
 
-    def _calculate_color_diversity_weight(self, color_region: np.ndarray,
-                                        gray_region: np.ndarray) -> float:
+    def _calculate_weight_matrix(self, cell_height: int,
+                                 cell_width: int) -> np.ndarray:
         """
-        Calcular peso basado en la presencia de colores específicos del heatmap:
-        PINK/MAGENTA y VERDE del heatmap (no del bosque)
+        Calcular los pesos de todas las celdas basados en la presencia de
+        colores específicos del heatmap: PINK/MAGENTA y VERDE (no del bosque)
+
+        La imagen se recorta a un múltiplo exacto del tamaño de celda
+        (igual que el recorrido original celda por celda), se convierte a
+        HSV una sola vez y las coberturas por celda se obtienen con
+        reducciones por bloques — sin bucles Python por celda.
 
         Args:
-            color_region: Región de la imagen en color
-            gray_region: Región de la imagen en escala de grises
+            cell_height: Alto de cada celda en píxeles
+            cell_width: Ancho de cada celda en píxeles
 
         Returns:
-            Peso normalizado entre 0 y 1
+            Matriz (filas, columnas) de pesos normalizados entre 0 y 1
         """
-        if color_region.size == 0:
-            return 0.0
+        rows, cols = self.grid_size
+
+        if len(self.image.shape) != 3:
+            # Si es escala de grises, usar solo intensidad
+            gray = self.heatmap_values[:rows * cell_height,
+                                       :cols * cell_width]
+            gray = gray.reshape(rows, cell_height, cols, cell_width)
+            intensity_coverage = (gray > 180).mean(axis=(1, 3))
+            pink_coverage = np.zeros((rows, cols))
+            green_coverage = np.zeros((rows, cols))
+            forest_penalty = np.zeros((rows, cols))
+        else:
+            # Recortar el HSV precalculado en load_image (vista, sin
+            # conversión adicional por llamada)
+            hsv = self.hsv[:rows * cell_height, :cols * cell_width]
+
+            # Vista por bloques (filas, alto_celda, columnas, ancho_celda)
+            # Los canales se mantienen en uint8 y los umbrales se comparan
+            # como enteros (0.3 -> 76, 0.4 -> 102, 0.6 -> 153, 0.7 -> 178),
+            # equivalentes a los umbrales normalizados sobre s/255 y v/255
+            block_shape = (rows, cell_height, cols, cell_width)
+            hue = hsv[:, :, 0].reshape(block_shape)
+            saturation = hsv[:, :, 1].reshape(block_shape)
+            value = hsv[:, :, 2].reshape(block_shape)
 
-        # Convertir a HSV para mejor detección de colores específicos
-        if len(color_region.shape) == 3:
-            # Normalizar a rango 0-1 para HSV
-            color_region_norm = color_region.astype(np.float32) / 255.0
-            
-            # Convertir RGB a HSV manualmente (OpenCV requiere uint8)
-            color_region_uint8 = (color_region_norm * 255).astype(np.uint8)
-            hsv_region = cv2.cvtColor(color_region_uint8, cv2.COLOR_RGB2HSV)
-            
-            # Extraer canales HSV
-            hue = hsv_region[:, :, 0].astype(np.float32)
-            saturation = hsv_region[:, :, 1].astype(np.float32) / 255.0
-            value = hsv_region[:, :, 2].astype(np.float32) / 255.0
-            
             # DETECTAR COLORES ESPECÍFICOS DEL HEATMAP
-            
+
             # 1. DETECTAR PINK/MAGENTA (Hue ~ 300-330 o 0-20)
-            pink_mask1 = ((hue >= 150) & (hue <= 180)) & (saturation > 0.3) & (value > 0.3)  # Magenta range in OpenCV
-            pink_mask2 = ((hue >= 0) & (hue <= 10)) & (saturation > 0.4) & (value > 0.4)     # Pink range
-            pink_mask = pink_mask1 | pink_mask2
-            pink_coverage = np.sum(pink_mask) / pink_mask.size
-            
+            pink_mask1 = ((hue >= 150) & (hue <= 180)) & (saturation > 76) & (value > 76)  # Magenta range in OpenCV
+            pink_mask2 = (hue <= 10) & (saturation > 102) & (value > 102)                  # Pink range
+            pink_coverage = (pink_mask1 | pink_mask2).mean(axis=(1, 3))
+
             # 2. DETECTAR VERDE del heatmap (Hue ~ 60-100, high saturation para distinguir del bosque)
             # Verde del heatmap tiene mayor saturación que el verde natural del bosque
-            green_mask = ((hue >= 40) & (hue <= 80)) & (saturation > 0.4) & (value > 0.3)
-            green_coverage = np.sum(green_mask) / green_mask.size
-            
+            green_mask = ((hue >= 40) & (hue <= 80)) & (saturation > 102) & (value > 76)
+            green_coverage = green_mask.mean(axis=(1, 3))
+
             # 3. DETECTAR intensidad general (para áreas que podrían tener heatmap)
-            high_intensity_mask = value > 0.7  # Áreas brillantes
-            intensity_coverage = np.sum(high_intensity_mask) / high_intensity_mask.size
-            
+            intensity_coverage = (value > 178).mean(axis=(1, 3))  # Áreas brillantes
+
             # 4. EVITAR áreas que son principalmente bosque (verde oscuro, baja saturación)
-            forest_mask = ((hue >= 35) & (hue <= 85)) & (saturation < 0.4) & (value < 0.6)
-            forest_penalty = np.sum(forest_mask) / forest_mask.size
-            
-        else:
-            # Si es escala de grises, usar solo intensidad
-            pink_coverage = 0.0
-            green_coverage = 0.0
-            intensity_coverage = np.sum(gray_region > 180) / gray_region.size
-            forest_penalty = 0.0
-        
+            forest_mask = ((hue >= 35) & (hue <= 85)) & (saturation < 102) & (value < 153)
+            forest_penalty = forest_mask.mean(axis=(1, 3))
+
         # CALCULAR PESO BASADO EN PRESENCIA DE COLORES DEL HEATMAP
-        
-        # Factor 1: Cobertura de PINK/MAGENTA (peso alto)
-        pink_score = pink_coverage * 2.0  # Amplificar el impacto del pink
-        
-        # Factor 2: Cobertura de VERDE del heatmap (peso alto)
-        green_score = green_coverage * 1.8  # Amplificar el verde del heatmap
-        
-        # Factor 3: Intensidad general (soporte)
-        intensity_score = intensity_coverage * 0.5
-        
-        # Factor 4: Penalización por áreas de bosque
-        forest_penalty_score = forest_penalty * 0.3
-        
-        # Combinar factores
+
+        # Combinar factores: pink/magenta y verde amplificados,
+        # intensidad como soporte y penalización por bosque
         weight = (
-            0.5 * pink_score +           # 50% peso al pink/magenta
-            0.3 * green_score +          # 30% peso al verde del heatmap  
-            0.2 * intensity_score -      # 20% intensidad general
-            0.1 * forest_penalty_score   # Penalizar bosque
+            0.5 * (pink_coverage * 2.0) +       # 50% peso al pink/magenta
+            0.3 * (green_coverage * 1.8) +      # 30% peso al verde del heatmap
+            0.2 * (intensity_coverage * 0.5) -  # 20% intensidad general
+            0.1 * (forest_penalty * 0.3)        # Penalizar bosque
         )
-        
+
         # Bonus por tener AMBOS colores del heatmap
-        if pink_coverage > 0.1 and green_coverage > 0.1:
-            weight *= 1.3  # 30% bonus por diversidad de heatmap
-        
+        both_colors = (pink_coverage > 0.1) & (green_coverage > 0.1)
+        weight = np.where(both_colors, weight * 1.3, weight)
+
         # Bonus extra por alta concentración de cualquier color del heatmap
-        max_heatmap_coverage = max(pink_coverage, green_coverage)
-        if max_heatmap_coverage > 0.3:
-            weight *= 1.2  # 20% bonus por alta concentración
-        
+        high_coverage = np.maximum(pink_coverage, green_coverage) > 0.3
+        weight = np.where(high_coverage, weight * 1.2, weight)
+
         # Asegurar que esté en rango [0, 1]
-        weight = np.clip(weight, 0.0, 1.0)
-        
-        return weight
+        return np.clip(weight, 0.0, 1.0)
 
     def create_edges(self, connection_type: str = "adjacent") -> None:
         """
         Crear aristas entre nodos según el tipo de conexión especificado
 
+        Las aristas se construyen en bloque a partir de la matriz de pesos
+        normalizados: para cada desplazamiento vecino los pesos de arista
+        se calculan con slicing de NumPy y se insertan con una sola llamada
+        a add_edges_from, en lugar de un add_edge por celda.
+
         Args:
             connection_type: Tipo de conexión ("adjacent", "diagonal", "all")
         """
         rows, cols = self.grid_size
-
-        for i in range(rows):
-            for j in range(cols):
-                current_node = (i, j)
-
-                # Conexiones adyacentes (arriba, abajo, izquierda, derecha)
-                if connection_type in ["adjacent", "all"]:
-                    adjacent_positions = [
-                        (i-1, j), (i+1, j), (i, j-1), (i, j+1)
-                    ]
-
-                    for pos in adjacent_positions:
-                        if (0 <= pos[0] < rows and 0 <= pos[1] < cols):
-                            # Peso de la arista basado en diferencia de pesos
-                            current_weight = self.nodes[current_node][
-                                'peso_normalizado']
-                            pos_weight = self.nodes[pos]['peso_normalizado']
-                            weight_diff = abs(current_weight - pos_weight)
-                            # Mayor similitud = menor peso de arista
-                            edge_weight = 1.0 - weight_diff
-
-                            self.graph.add_edge(current_node, pos,
-                                                weight=edge_weight)
-
-                # Conexiones diagonales
-                if connection_type in ["diagonal", "all"]:
-                    diagonal_positions = [
-                        (i-1, j-1), (i-1, j+1), (i+1, j-1), (i+1, j+1)
-                    ]
-
-                    for pos in diagonal_positions:
-                        if (0 <= pos[0] < rows and 0 <= pos[1] < cols):
-                            current_weight = self.nodes[current_node][
-                                'peso_normalizado']
-                            pos_weight = self.nodes[pos]['peso_normalizado']
-                            weight_diff = abs(current_weight - pos_weight)
-                            edge_weight = 1.0 - weight_diff
-
-                            self.graph.add_edge(current_node, pos,
-                                                weight=edge_weight)
-
-        print(f"Creadas {self.graph.number_of_edges()} aristas con "
-              f"conexión tipo '{connection_type}'")
+        wn = self._wn
+        self._adj_cache = None
+        self._connection_type = connection_type
+
+        # Desplazamientos (di, dj); como el grafo es no dirigido basta con
+        # la mitad de los 8 vecinos para generar cada arista una sola vez
+        offsets = []
+        if connection_type in ["adjacent", "all"]:
+            offsets += [(1, 0), (0, 1)]
+        if connection_type in ["diagonal", "all"]:
+            offsets += [(1, 1), (1, -1)]
+
+        for di, dj in offsets:
+            # Filas/columnas de origen válidas para este desplazamiento
+            i0, i1 = max(0, -di), rows - max(0, di)
+            j0, j1 = max(0, -dj), cols - max(0, dj)
+
+            # Peso de la arista basado en diferencia de pesos
+            # Mayor similitud = menor diferencia = mayor peso de arista
+            src = wn[i0:i1, j0:j1]
+            dst = wn[i0 + di:i1 + di, j0 + dj:j1 + dj]
+            edge_weights = 1.0 - np.abs(src - dst)
+
+            si, sj = np.meshgrid(np.arange(i0, i1), np.arange(j0, j1),
+                                 indexing='ij')
+            self.graph.add_edges_from(
+                ((int(i), int(j)), (int(i) + di, int(j) + dj),
+                 {'weight': float(w)})
+                for i, j, w in zip(si.ravel(), sj.ravel(),
+                                   edge_weights.ravel()))
+
+        if self.verbose:
+            print(f"Creadas {self.graph.number_of_edges()} aristas con "
+                  f"conexión tipo '{connection_type}'")
 
     def visualize_graph_on_image(self, save_path: str = None,
-                                 show_weights: bool = True) -> None:
+                                 show_weights: bool = True,
+                                 fast: bool = False) -> None:
         """
         Visualizar el grafo superpuesto sobre la imagen original
 
         Args:
             save_path: Ruta para guardar la imagen (opcional)
             show_weights: Si mostrar los pesos de los nodos
+            fast: Si usar el renderizado raster con OpenCV en lugar de
+                matplotlib (mucho más rápido para grillas grandes)
         """
         if self.image is None or not self.nodes:
             raise ValueError("Debe cargar una imagen y crear nodos primero")
 
+        if fast:
+            self._visualize_cv2(save_path)
+            return
+
         fig, ax = plt.subplots(1, 1, figsize=(12, 10))
 
         # Mostrar imagen original
@@ -321,34 +340,30 @@ class HeatmapToGraph:
             ax.axvline(x=x, color='white', linestyle='-',
                        alpha=0.3, linewidth=0.5)
 
-        # Dibujar aristas
-        for edge in self.graph.edges():
-            node1, node2 = edge
-            pos1 = self.nodes[node1]['posicion']
-            pos2 = self.nodes[node2]['posicion']
-
-            ax.plot([pos1[0], pos2[0]], [pos1[1], pos2[1]],
-                    'b-', alpha=0.6, linewidth=1)
-
-        # Dibujar nodos
-        for node_pos, node_info in self.nodes.items():
-            x, y = node_info['posicion']
-            peso_norm = node_info['peso_normalizado']
-
-            # Tamaño del nodo basado en el peso
-            node_size = 50 + (peso_norm * 200)  # Tamaño entre 50 y 250
-
-            # Color del nodo basado en el peso (colormap de calor)
-            color = plt.cm.hot(peso_norm)
-
-            # Dibujar nodo
-            circle = plt.Circle((x, y), radius=np.sqrt(node_size)/3,
-                                color=color, alpha=0.8, ec='white',
-                                linewidth=2)
-            ax.add_patch(circle)
-
-            # Mostrar peso si se solicita
-            if show_weights:
+        # Dibujar aristas: todos los segmentos en una sola LineCollection
+        # en lugar de una llamada a ax.plot por arista
+        if self.graph.number_of_edges() > 0:
+            edge_idx = np.array(list(self.graph.edges()))
+            ex = self._x_matrix[edge_idx[:, :, 0], edge_idx[:, :, 1]]
+            ey = self._y_matrix[edge_idx[:, :, 0], edge_idx[:, :, 1]]
+            segments = np.stack([ex, ey], axis=-1)
+            ax.add_collection(LineCollection(segments, colors='b',
+                                             alpha=0.6, linewidths=1))
+
+        # Dibujar nodos: un único scatter vectorizado en lugar de un
+        # plt.Circle por nodo
+        xs = self._x_matrix.ravel()
+        ys = self._y_matrix.ravel()
+        pesos = self._wn.ravel()
+
+        # Tamaño del nodo basado en el peso (entre 50 y 250)
+        # Color del nodo basado en el peso (colormap de calor)
+        ax.scatter(xs, ys, s=50 + pesos * 200, c=plt.cm.hot(pesos),
+                   alpha=0.8, edgecolors='white', linewidths=2)
+
+        # Mostrar pesos si se solicita
+        if show_weights:
+            for x, y, peso_norm in zip(xs, ys, pesos):
                 ax.text(x, y, f'{peso_norm:.2f}',
                         ha='center', va='center', fontsize=8,
                         fontweight='bold', color='white')
@@ -364,14 +379,64 @@ class HeatmapToGraph:
         # cbar = plt.colorbar(sm, ax=ax, shrink=0.8)
         # cbar.set_label('Peso Normalizado', rotation=270, labelpad=15)
 
-        plt.tight_layout()
+        fig.tight_layout()
 
         if save_path:
             # Construir la ruta final (ejemplo: frontend/public/graph.png)
             output_path = os.path.join("..", "frontend", "public", "graph.png")
-            
-            plt.savefig(output_path, dpi=300, bbox_inches="tight")
-            print(f"Imagen guardada en: {output_path}")
+
+            # Guardar y cerrar sobre la figura propia (no el estado global
+            # de pyplot): con renders concurrentes en hilos, plt.savefig
+            # escribiría la figura "actual" de otro hilo
+            fig.savefig(output_path, dpi=300, bbox_inches="tight")
+            plt.close(fig)
+            if self.verbose:
+                print(f"Imagen guardada en: {output_path}")
+
+    def _visualize_cv2(self, save_path: str = None) -> None:
+        """
+        Renderizado raster del grafo con primitivas de OpenCV, para
+        grillas grandes donde el pipeline de matplotlib domina el tiempo
+
+        Args:
+            save_path: Ruta para guardar la imagen (opcional)
+        """
+        canvas = self.image.copy()
+
+        # Aristas en azul (equivalente al 'b-' de matplotlib)
+        if self.graph.number_of_edges() > 0:
+            edge_idx = np.array(list(self.graph.edges()))
+            ex = self._x_matrix[edge_idx[:, :, 0],
+                                edge_idx[:, :, 1]].astype(int)
+            ey = self._y_matrix[edge_idx[:, :, 0],
+                                edge_idx[:, :, 1]].astype(int)
+            for (x1, x2), (y1, y2) in zip(ex, ey):
+                cv2.line(canvas, (x1, y1), (x2, y2), (0, 0, 255), 1,
+                         cv2.LINE_AA)
+
+        # Nodos coloreados con el mismo colormap de calor; los colores se
+        # toman de una LUT precalculada indexada por el peso
+        lut = (plt.cm.hot(np.linspace(0.0, 1.0, 256))[:, :3]
+               * 255).astype(np.uint8)
+        xs = self._x_matrix.ravel().astype(int)
+        ys = self._y_matrix.ravel().astype(int)
+        pesos = self._wn.ravel()
+        radios = np.sqrt(50 + pesos * 200) / 3
+
+        for x, y, peso, radio in zip(xs, ys, pesos, radios):
+            color = tuple(int(v) for v in lut[int(peso * 255)])
+            cv2.circle(canvas, (x, y), max(3, int(radio)), color, -1,
+                       cv2.LINE_AA)
+
+        if save_path:
+            # Construir la ruta final (ejemplo: frontend/public/graph.png)
+            output_path = os.path.join("..", "frontend", "public",
+                                       "graph.png")
+
+            cv2.imwrite(output_path, cv2.cvtColor(canvas,
+                                                  cv2.COLOR_RGB2BGR))
+            if self.verbose:
+                print(f"Imagen guardada en: {output_path}")
 
     def get_graph_statistics(self) -> Dict:
         """
@@ -383,12 +448,22 @@ class HeatmapToGraph:
         if not self.graph.nodes():
             return {}
 
+        # Conectividad: con conexiones adyacentes la grilla completa es
+        # conexa por construcción, sin necesidad de recorrer el grafo;
+        # solo los otros tipos de conexión requieren nx.is_connected
+        rows, cols = self.grid_size
+        if (self._connection_type in ("adjacent", "all")
+                and self.graph.number_of_nodes() == rows * cols):
+            is_connected = True
+        else:
+            is_connected = nx.is_connected(self.graph)
+
         # Estadísticas básicas
         stats = {
             'num_nodes': self.graph.number_of_nodes(),
             'num_edges': self.graph.number_of_edges(),
             'density': nx.density(self.graph),
-            'is_connected': nx.is_connected(self.graph)
+            'is_connected': is_connected
         }
 
         # Estadísticas de pesos
@@ -426,7 +501,8 @@ class HeatmapToGraph:
             raise ValueError("Formato no soportado. "
                              "Use 'gexf', 'graphml', o 'pickle'")
 
-        print(f"Grafo guardado en: {filepath}")
+        if self.verbose:
+            print(f"Grafo guardado en: {filepath}")
 
     def get_adjacency_matrix(self) -> np.ndarray:
         """
@@ -437,23 +513,20 @@ class HeatmapToGraph:
         """
         if not self.graph.nodes():
             raise ValueError("El grafo está vacío")
-        
-        # Crear mapeo de nodos a índices
-        nodes = sorted(self.graph.nodes())
-        node_to_idx = {node: i for i, node in enumerate(nodes)}
-        
-        # Crear matriz de adyacencia
-        n = len(nodes)
-        adj_matrix = np.zeros((n, n))
-        
-        for edge in self.graph.edges(data=True):
-            i = node_to_idx[edge[0]]
-            j = node_to_idx[edge[1]]
-            weight = edge[2].get('weight', 1.0)
-            adj_matrix[i, j] = weight
-            adj_matrix[j, i] = weight  # Grafo no dirigido
-        
-        return adj_matrix, nodes
+
+        # Resultado memorizado: main y print_matrices_info piden esta
+        # matriz varias veces sin modificar el grafo entre llamadas
+        # (create_grid_nodes/create_edges invalidan la caché)
+        if self._adj_cache is None:
+            # NetworkX rellena la matriz en C (simétrica para grafos no
+            # dirigidos), sin iterar las aristas en Python
+            nodes = sorted(self.graph.nodes())
+            adj_matrix = nx.to_numpy_array(self.graph, nodelist=nodes,
+                                           weight='weight',
+                                           dtype=np.float64)
+            self._adj_cache = (adj_matrix, nodes)
+
+        return self._adj_cache
     
     def get_weight_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -465,15 +538,7 @@ class HeatmapToGraph:
         if not self.nodes:
             raise ValueError("No hay nodos creados")
 
-        rows, cols = self.grid_size
-        weight_matrix = np.zeros((rows, cols))
-        weight_matrix_normalized = np.zeros((rows, cols))
-
-        for (i, j), node_info in self.nodes.items():
-            weight_matrix[i, j] = node_info['peso']
-            weight_matrix_normalized[i, j] = node_info['peso_normalizado']
-
-        return weight_matrix, weight_matrix_normalized
+        return self._weight_matrix, self._wn
 
     def get_cost_matrix(self) -> np.ndarray:
         """
@@ -485,13 +550,7 @@ class HeatmapToGraph:
         if not self.nodes:
             raise ValueError("No hay nodos creados")
 
-        rows, cols = self.grid_size
-        cost_matrix = np.zeros((rows, cols))
-
-        for (i, j), node_info in self.nodes.items():
-            cost_matrix[i, j] = node_info['costo']
-
-        return cost_matrix
+        return self._cost_matrix
     
     def get_node_coordinates_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -502,25 +561,23 @@ class HeatmapToGraph:
         """
         if not self.nodes:
             raise ValueError("No hay nodos creados")
-        
-        rows, cols = self.grid_size
-        x_matrix = np.zeros((rows, cols))
-        y_matrix = np.zeros((rows, cols))
-        
-        for (i, j), node_info in self.nodes.items():
-            x, y = node_info['posicion']
-            x_matrix[i, j] = x
-            y_matrix[i, j] = y
-        
-        return x_matrix, y_matrix
+
+        return self._x_matrix, self._y_matrix
     
-    def export_matrices_to_files(self, base_filename: str) -> Dict[str, str]:
+    def export_matrices_to_files(self, base_filename: str,
+                                 csv: bool = False) -> Dict[str, str]:
         """
-        Exportar matrices organizadas: archivos principales en data/ y 
+        Exportar matrices organizadas: archivos principales en data/ y
         datos detallados en data/[name]_data/
 
+        Los archivos detallados se guardan en formato .npy (binario); las
+        versiones CSV, mucho más lentas de escribir, solo se generan si
+        se solicitan. Las matrices principales de beneficios y costos
+        siempre se exportan como CSV.
+
         Args:
             base_filename: Nombre base para los archivos
+            csv: Si exportar también los archivos detallados como CSV
 
         Returns:
             Diccionario con las rutas de los archivos creados
@@ -544,36 +601,30 @@ class HeatmapToGraph:
         # Matriz de beneficios normalizada (CSV principal)
         weight_matrix, weight_normalized = self.get_weight_matrix()
         benefits_main_csv = f"{data_dir}/{base_filename}_benefits_normalized_matrix.csv"
-        np.savetxt(benefits_main_csv, weight_normalized, delimiter=',', fmt='%.6f')
+        np.savetxt(benefits_main_csv, weight_normalized, delimiter=',', fmt='%.4f')
         files_created['benefits_main_csv'] = benefits_main_csv
 
         # Matriz de costos (CSV principal)
         cost_matrix = self.get_cost_matrix()
         costs_main_csv = f"{data_dir}/{base_filename}_costs_matrix.csv"
-        np.savetxt(costs_main_csv, cost_matrix, delimiter=',', fmt='%.6f')
+        np.savetxt(costs_main_csv, cost_matrix, delimiter=',', fmt='%.4f')
         files_created['costs_main_csv'] = costs_main_csv
 
         # === ARCHIVOS DETALLADOS (en data/[name]_data/) ===
 
         # Matriz de adyacencia
         adj_matrix, nodes = self.get_adjacency_matrix()
-        adj_file_csv = f"{detailed_data_dir}/adjacency_matrix.csv"
         adj_file_npy = f"{detailed_data_dir}/adjacency_matrix.npy"
-        np.savetxt(adj_file_csv, adj_matrix, delimiter=',', fmt='%.6f')
         np.save(adj_file_npy, adj_matrix)
-        files_created['adjacency_csv'] = adj_file_csv
         files_created['adjacency_npy'] = adj_file_npy
 
         # Matrices completas de beneficios
-        benefits_csv = f"{detailed_data_dir}/benefits_matrix.csv"
         benefits_norm_npy = f"{detailed_data_dir}/benefits_normalized_matrix.npy"
         benefits_npy = f"{detailed_data_dir}/benefits_matrix.npy"
-        
-        np.savetxt(benefits_csv, weight_matrix, delimiter=',', fmt='%.6f')
+
         np.save(benefits_norm_npy, weight_normalized)
         np.save(benefits_npy, weight_matrix)
-        
-        files_created['benefits_detailed_csv'] = benefits_csv
+
         files_created['benefits_normalized_npy'] = benefits_norm_npy
         files_created['benefits_npy'] = benefits_npy
 
@@ -584,21 +635,32 @@ class HeatmapToGraph:
 
         # Coordenadas
         x_matrix, y_matrix = self.get_node_coordinates_matrix()
-        x_file_csv = f"{detailed_data_dir}/x_coordinates.csv"
-        y_file_csv = f"{detailed_data_dir}/y_coordinates.csv"
         x_file_npy = f"{detailed_data_dir}/x_coordinates.npy"
         y_file_npy = f"{detailed_data_dir}/y_coordinates.npy"
 
-        np.savetxt(x_file_csv, x_matrix, delimiter=',', fmt='%.1f')
-        np.savetxt(y_file_csv, y_matrix, delimiter=',', fmt='%.1f')
         np.save(x_file_npy, x_matrix)
         np.save(y_file_npy, y_matrix)
 
-        files_created['x_coords_csv'] = x_file_csv
-        files_created['y_coords_csv'] = y_file_csv
         files_created['x_coords_npy'] = x_file_npy
         files_created['y_coords_npy'] = y_file_npy
 
+        # Versiones CSV de los archivos detallados (solo si se solicitan)
+        if csv:
+            adj_file_csv = f"{detailed_data_dir}/adjacency_matrix.csv"
+            benefits_csv = f"{detailed_data_dir}/benefits_matrix.csv"
+            x_file_csv = f"{detailed_data_dir}/x_coordinates.csv"
+            y_file_csv = f"{detailed_data_dir}/y_coordinates.csv"
+
+            np.savetxt(adj_file_csv, adj_matrix, delimiter=',', fmt='%.4f')
+            np.savetxt(benefits_csv, weight_matrix, delimiter=',', fmt='%.4f')
+            np.savetxt(x_file_csv, x_matrix, delimiter=',', fmt='%.1f')
+            np.savetxt(y_file_csv, y_matrix, delimiter=',', fmt='%.1f')
+
+            files_created['adjacency_csv'] = adj_file_csv
+            files_created['benefits_detailed_csv'] = benefits_csv
+            files_created['x_coords_csv'] = x_file_csv
+            files_created['y_coords_csv'] = y_file_csv
+
         # Información de nodos (mapeo)
         nodes_info_file = f"{detailed_data_dir}/nodes_mapping.txt"
         with open(nodes_info_file, 'w') as f:
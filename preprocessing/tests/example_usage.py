@@ -4,6 +4,7 @@ Ejemplo de uso de la clase HeatmapToGraph para obtener matrices y grafo
 """
 
 from image_to_graph import HeatmapToGraph
+import networkx as nx
 import numpy as np
 
 # %%
@@ -92,18 +93,24 @@ def example_usage():
         print(f"  Posición en grilla: {max_weight_idx}")
         print(f"  Peso normalizado: {max_weight_value:.4f}")
         
-        # Calcular distancia promedio entre nodos conectados
-        edge_weights = [d['weight'] for _, _, d in converter.graph.edges(data=True)]
+        # Calcular distancia promedio entre nodos conectados; un solo
+        # recorrido del grafo deja los pesos en un dict de acceso O(1)
+        edge_weight_cache = nx.get_edge_attributes(converter.graph, 'weight')
+        edge_weights = list(edge_weight_cache.values())
         avg_edge_weight = np.mean(edge_weights) if edge_weights else 0
         print(f"\n• Peso promedio de aristas: {avg_edge_weight:.4f}")
-        
-        # Mostrar conexiones del nodo central
+
+        # Mostrar conexiones del nodo central (reusando el cache de pesos;
+        # las aristas no son dirigidas, así que la clave puede venir en
+        # cualquier orden)
         center_node = (2, 2)  # Centro de grilla 5x5
         if center_node in converter.graph:
             neighbors = list(converter.graph.neighbors(center_node))
             print(f"\n• Conexiones del nodo central {center_node}:")
             for neighbor in neighbors:
-                edge_weight = converter.graph.edges[center_node, neighbor]['weight']
+                edge_weight = edge_weight_cache.get(
+                    (center_node, neighbor),
+                    edge_weight_cache.get((neighbor, center_node)))
                 print(f"  -> {neighbor} (peso arista: {edge_weight:.4f})")
         
         return {
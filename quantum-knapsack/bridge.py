@@ -2,7 +2,8 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'quadqaoa.py')))
 
-import csv
+import numpy as np
+
 import knapsack
 import circuits
 from quadqaoa import find_optimal_angles, get_probs_dict
@@ -10,17 +11,16 @@ import visualization
 
 def read_knapsack_csv(filepath):
     """Lee un CSV y retorna listas de beneficios, costos y el peso máximo."""
-    values = []
-    weights = []
+    # Parseo vectorizado del CSV completo (la columna max_weight solo
+    # trae valor en la primera fila; el resto queda como NaN)
+    data = np.genfromtxt(filepath, delimiter=',', names=True)
+    values = np.atleast_1d(data['beneficio']).tolist()
+    weights = np.atleast_1d(data['costo']).tolist()
+
     max_weight = None
-    with open(filepath, newline='') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            values.append(float(row['beneficio']))
-            weights.append(float(row['costo']))
-            if 'max_weight' in row and max_weight is None:
-                max_weight = float(row['max_weight'])
-    if max_weight is None:
+    if 'max_weight' in (data.dtype.names or ()):
+        max_weight = float(np.atleast_1d(data['max_weight'])[0])
+    if max_weight is None or np.isnan(max_weight):
         # Si no viene en el CSV, puedes definirlo manualmente aquí
         max_weight = sum(weights) / 2  # ejemplo: la mitad del total
     return values, weights, max_weight
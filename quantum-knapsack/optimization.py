@@ -5,10 +5,10 @@ from scipy.optimize import shgo
 
 def average_value(probs_dict, func):
     """Calculate the average value of a function over a probability dict."""
-    bitstrings = list(probs_dict.keys())
-    values = np.array(list(map(func, bitstrings)))
-    probs = np.array(list(probs_dict.values()))
-    return sum(values * probs)
+    bitstrings, probs = zip(*probs_dict.items())
+    values = np.fromiter(map(func, bitstrings), dtype=np.float64,
+                         count=len(bitstrings))
+    return float(np.dot(values, np.asarray(probs, dtype=np.float64)))
 
 
 def optimize_angles(p, angles_to_value, gamma_range, beta_range):
@@ -16,7 +16,15 @@ def optimize_angles(p, angles_to_value, gamma_range, beta_range):
     bounds = np.array([gamma_range, beta_range] * p)
     print(f"Optimizando con bounds: {bounds}")
     try:
-        result = shgo(angles_to_value, bounds, iters=3)
+        # Muestreo Sobol determinista: más barato que la triangulación
+        # simplicial por defecto cuando crece el número de ángulos (2p)
+        # minhgrd=0 corta las iteraciones restantes cuando una iteración
+        # ya no aporta mínimos locales nuevos (el objetivo llegó a meseta);
+        # maxiter conserva el tope de 3 iteraciones, porque al pasar
+        # cualquier criterio en options shgo descarta el argumento iters
+        result = shgo(angles_to_value, bounds, iters=3, n=64,
+                      sampling_method='sobol',
+                      options={'minhgrd': 0, 'maxiter': 3})
         print(f"Resultado de shgo: {result}")
         if hasattr(result, "x") and result.x is not None:
             return result.x
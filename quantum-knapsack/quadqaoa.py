@@ -80,15 +80,30 @@ def get_expectation_value(circuit, problem, angles, a, b):
 def find_optimal_angles(circuit, problem, a, b):
     """Optimize the parameters beta, gamma for given circuit and parameters."""
     transpiled_circuit = transpile(circuit, sim.backend)
-    obj = partial(objective_function, problem=problem, a=a, b=b)
     angles_to_parameters = partial(to_parameter_dict, circuit=circuit, a=a, b=b)
 
+    # Statevector indices enumerate the bitstrings in order, so the whole
+    # bitstring -> objective map collapses into a table computed once per
+    # search; every SHGO evaluation is then a single dot product instead
+    # of a Python loop over the probability dict. The table itself is
+    # built by unpacking the bits of all indices at once (bit k of index
+    # i is qubit k) and evaluating the objective with matrix-vector
+    # products instead of 2^n Python calls.
+    num_qubits = circuit.num_qubits
+    indices = np.arange(1 << num_qubits, dtype=np.int64)
+    bits = ((indices[:, None] >> np.arange(num_qubits)) & 1).astype(np.float64)
+    x = bits[:, :problem.N]
+    y = bits[:, problem.N:]
+    penalty = ((1 - y.sum(axis=1)) ** 2
+               + (y @ np.arange(1, problem.max_weight + 1, dtype=np.float64)
+                  - x @ np.asarray(problem.weights, dtype=np.float64)) ** 2)
+    value_table = (a * (x @ np.asarray(problem.values, dtype=np.float64))
+                   - b * penalty)
+
     def angles_to_value(angles):
         parameter_dict = angles_to_parameters(angles)
         statevector = sim.get_statevector(transpiled_circuit, parameter_dict)
-        probs_dict = statevector.probabilities_dict()
-        value = - optimization.average_value(probs_dict, obj)
-        return value
+        return -float(statevector.probabilities() @ value_table)
 
     return optimization.optimize_angles(circuit.p, angles_to_value,
                                         circuit.gamma_range(a, b),
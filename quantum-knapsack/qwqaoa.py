@@ -61,15 +61,26 @@ def get_expectation_value(circuit, problem, angles):
 def find_optimal_angles(circuit, problem):
     """Optimize the parameters beta, gamma for given circuit and parameters."""
     transpiled_circuit = transpile(circuit, sim.backend)
-    obj = partial(objective_function, problem=problem)
     angles_to_parameters = partial(to_parameter_dict, circuit=circuit)
 
+    # Statevector indices enumerate the bitstrings in order, so the whole
+    # bitstring -> objective map collapses into a table computed once per
+    # search; every SHGO evaluation is then a single dot product instead
+    # of a Python loop over the probability dict. The objective depends
+    # only on the N choice qubits (the low bits of each index), so a
+    # 2^N table built with one matrix-vector product covers all basis
+    # states after indexing with the masked indices.
+    num_qubits = circuit.num_qubits
+    choices = ((np.arange(1 << problem.N)[:, None]
+                >> np.arange(problem.N)) & 1).astype(np.float64)
+    choice_table = choices @ np.asarray(problem.values, dtype=np.float64)
+    indices = np.arange(1 << num_qubits, dtype=np.int64)
+    value_table = choice_table[indices & ((1 << problem.N) - 1)]
+
     def angles_to_value(angles):
         parameter_dict = angles_to_parameters(angles)
         statevector = sim.get_statevector(transpiled_circuit, parameter_dict)
-        probs_dict = statevector.probabilities_dict()
-        value = - optimization.average_value(probs_dict, obj)
-        return value
+        return -float(statevector.probabilities() @ value_table)
 
     return optimization.optimize_angles(circuit.p, angles_to_value,
                                         circuit.gamma_range(),